@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Local Query API
+Read-only HTTP service over the scraped listings and their precomputed aggregates
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import logging
+
+from listing_io import find_listings_file, iter_listings, strip_placeholders
+from market_cube import ALL, DIMENSIONS, MarketCube, listing_key
+from seller_index import SellerIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ListingStore:
+    """Immutable in-memory snapshot of the listings with lookup indexes"""
+
+    def __init__(self, listings: List[Dict], version: str):
+        """
+        Index a list of listings
+
+        Args:
+            listings: Listing dictionaries (duplicates by ID are dropped, data: placeholder images removed)
+            version: Identifier of the data file state this snapshot was built from
+        """
+        self.version = version
+        self.listings: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.prices: List[Optional[float]] = []
+        self.indexes: Dict[str, Dict[str, List[int]]] = {d: {} for d in DIMENSIONS}
+
+        for listing in listings:
+            listing_id = str(listing.get('id'))
+            if listing_id in self.by_id:
+                continue
+
+            listing = strip_placeholders(listing)
+            position = len(self.listings)
+            self.listings.append(listing)
+            self.by_id[listing_id] = listing
+
+            key, price = listing_key(listing)
+            self.prices.append(price)
+            for dimension, value in zip(DIMENSIONS, key):
+                self.indexes[dimension].setdefault(value, []).append(position)
+
+        self.cube = MarketCube.build(self.listings)
+        self.sellers = SellerIndex()
+        self.sellers.add_listings(self.listings)
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'ListingStore':
+        """Load and index a listings file in any format supported by listing_io"""
+        stat = os.stat(filename)
+        return cls(list(iter_listings(filename)), f"{filename}:{stat.st_mtime_ns}-{stat.st_size}")
+
+    def filter(self, filters: Dict[str, str], min_price: Optional[float] = None,
+               max_price: Optional[float] = None) -> List[int]:
+        """
+        Return listing positions matching all filters
+
+        Args:
+            filters: Dimension values to match (location, category, segment, month)
+            min_price: Minimum numeric price (inclusive)
+            max_price: Maximum numeric price (inclusive)
+
+        Returns:
+            Sorted list of positions into self.listings
+        """
+        positions = None
+        # Intersect starting from the smallest posting list
+        postings = sorted((self.indexes[d].get(v, []) for d, v in filters.items()), key=len)
+        for posting in postings:
+            positions = set(posting) if positions is None else positions.intersection(posting)
+
+        result = sorted(positions) if positions is not None else range(len(self.listings))
+        if min_price is None and max_price is None:
+            return list(result)
+
+        return [
+            p for p in result
+            if self.prices[p] is not None
+            and (min_price is None or self.prices[p] >= min_price)
+            and (max_price is None or self.prices[p] <= max_price)
+        ]
+
+    def summary(self) -> Dict:
+        """Return summary statistics of the snapshot"""
+        total = self.cube.query()
+        baku = self.cube.query(location='Bakı şəhəri')
+        categories = self.cube.breakdown('category')
+        top_category = max(categories.items(), key=lambda item: item[1].count) if categories else None
+        seller_summary = self.sellers.summary()
+        return {
+            'total_listings': len(self.listings),
+            'price': total.to_dict() if total else None,
+            'total_categories': len(categories),
+            'listings_in_baku': baku.count if baku else 0,
+            'listings_with_phone': seller_summary['indexed_listings'],
+            'segments': {k: v.count for k, v in self.cube.breakdown('segment').items()},
+            'top_category': top_category[0] if top_category else None,
+            'top_category_volume': top_category[1].count if top_category else 0,
+            'total_sellers': seller_summary['total_sellers'],
+            'multi_listing_sellers': seller_summary['multi_listing_sellers']
+        }
+
+
+class QueryService:
+    """Holds the current snapshot, reloads it when the data file changes, and caches responses"""
+
+    def __init__(self, data_file: Optional[str] = None, reload_interval: float = 2.0, cache_size: int = 1024):
+        """
+        Load the data file and start watching it
+
+        Args:
+            data_file: Listings file written by the scraper (None follows the most recently written one)
+            reload_interval: Seconds between data file change checks
+            cache_size: Maximum number of cached responses
+        """
+        self.follow_latest = data_file is None
+        self.data_file = data_file or find_listings_file()
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self.store = ListingStore.from_file(self.data_file)
+        self._cache: Dict[Tuple[str, str], Tuple[int, bytes, str]] = {}
+        self._lock = threading.Lock()
+        logger.info(f"Loaded {len(self.store.listings)} listings from {self.data_file}")
+
+    def _file_version(self) -> Optional[str]:
+        """Return the current version of the data file, or None if it is missing"""
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return f"{self.data_file}:{stat.st_mtime_ns}-{stat.st_size}"
+
+    def watch(self):
+        """Reload the snapshot whenever the data file changes (runs in a daemon thread)"""
+        while True:
+            time.sleep(self.reload_interval)
+            if self.follow_latest:
+                # The scraper may switch formats, e.g. from the legacy JSON to .jsonl.gz
+                self.data_file = find_listings_file()
+            version = self._file_version()
+            if not version or version == self.store.version:
+                continue
+
+            try:
+                store = ListingStore.from_file(self.data_file)
+            except Exception as e:
+                # The scraper may still be writing the file; retry on the next tick
+                logger.warning(f"Reload of {self.data_file} failed: {e}")
+                continue
+
+            with self._lock:
+                self.store = store
+                self._cache.clear()
+            logger.info(f"Reloaded {len(store.listings)} listings from {self.data_file}")
+
+    def handle(self, store: ListingStore, path: str, query: Dict[str, str]) -> Tuple[int, Dict]:
+        """
+        Route a request to its handler
+
+        Args:
+            store: Snapshot to answer from
+            path: Request path
+            query: Query parameters (single-valued)
+
+        Returns:
+            Tuple of HTTP status and JSON-serializable payload
+        """
+        parts = [p for p in path.split('/') if p]
+
+        if parts == ['listings']:
+            return self._list(store, query)
+        if len(parts) == 2 and parts[0] == 'listings':
+            listing = store.by_id.get(parts[1])
+            return (200, listing) if listing else (404, {'error': 'listing not found'})
+        if parts == ['stats']:
+            return 200, store.summary()
+        if parts == ['cube']:
+            cell = store.cube.query(**{d: query.get(d, ALL) for d in DIMENSIONS})
+            return 200, cell.to_dict() if cell else {'count': 0}
+        if len(parts) == 2 and parts[0] == 'sellers':
+            seller = store.sellers.lookup(parts[1])
+            return (200, seller) if seller else (404, {'error': 'seller not found'})
+        return 404, {'error': 'not found'}
+
+    def _list(self, store: ListingStore, query: Dict[str, str]) -> Tuple[int, Dict]:
+        """Filtered, paginated listing query"""
+        try:
+            page = max(int(query.get('page', 1)), 1)
+            per_page = min(max(int(query.get('per_page', 20)), 1), 200)
+            min_price = float(query['min_price']) if 'min_price' in query else None
+            max_price = float(query['max_price']) if 'max_price' in query else None
+        except ValueError:
+            return 400, {'error': 'invalid page or price parameter'}
+
+        filters = {d: query[d] for d in DIMENSIONS if d in query}
+        positions = store.filter(filters, min_price, max_price)
+        start = (page - 1) * per_page
+        return 200, {
+            'total': len(positions),
+            'page': page,
+            'per_page': per_page,
+            'results': [store.listings[p] for p in positions[start:start + per_page]]
+        }
+
+    def respond(self, raw_path: str) -> Tuple[int, bytes, str]:
+        """
+        Return status, body and ETag for a request, serving repeats from the cache
+
+        Args:
+            raw_path: Request path including the query string
+
+        Returns:
+            Tuple of HTTP status, encoded JSON body and ETag
+        """
+        store = self.store
+        cache_key = (store.version, raw_path)
+        cached = self._cache.get(cache_key)
+        if cached:
+            return cached
+
+        parsed = urlparse(raw_path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        status, payload = self.handle(store, parsed.path, query)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        response = (status, body, etag)
+
+        with self._lock:
+            if store is self.store:
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[cache_key] = response
+        return response
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler delegating to the server's QueryService"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; avoid Nagle delays on keep-alive
+    disable_nagle_algorithm = True
+
+    def _etag_matches(self, etag: str) -> bool:
+        """Return True if the request's If-None-Match header matches etag (a list of tags or '*')"""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        # Weak comparison, as If-None-Match requires
+        tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+        return '*' in tags or etag.removeprefix('W/') in tags
+
+    def do_GET(self):
+        """Serve a GET request with ETag revalidation"""
+        try:
+            status, body, etag = self.server.service.respond(self.path)
+        except Exception as e:
+            logger.error(f"Error serving {self.path}: {e}")
+            status, body, etag = 500, b'{"error": "internal error"}', None
+
+        if etag and self._etag_matches(etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Route access logs through logging at debug level"""
+        logger.debug(format % args)
+
+
+def serve(data_file: Optional[str] = None, host: str = "127.0.0.1",
+          port: int = 8000, reload_interval: float = 2.0):
+    """
+    Start the query API and block until interrupted
+
+    Args:
+        data_file: Listings file written by the scraper (defaults to the most recently written one)
+        host: Interface to bind
+        port: Port to bind
+        reload_interval: Seconds between data file change checks
+    """
+    service = QueryService(data_file, reload_interval=reload_interval)
+    threading.Thread(target=service.watch, daemon=True).start()
+
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    logger.info(f"Serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Register the command-line options"""
+    parser.add_argument('--data', help="Listings file (defaults to the most recently written one)")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help="Seconds between data file change checks")
+
+
+def run(args: argparse.Namespace):
+    """Run with parsed command-line options"""
+    serve(args.data, args.host, args.port, args.reload_interval)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Serve scraped listings over a local HTTP API")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
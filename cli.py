@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Command Line Interface
+Single entry point for scraping, analysis, charts, export and stats
+
+Each subcommand's module is imported only when that subcommand runs, so
+commands that do not need pandas or matplotlib start quickly.
+"""
+
+import argparse
+import importlib
+import logging
+import sys
+
+# Subcommand -> (module providing add_arguments/run, help text)
+COMMANDS = {
+    'scrape': ('scraper', "Scrape listings from xidmetler.az"),
+    'recrawl': ('recrawl', "Recheck due listings within a request budget"),
+    'explore': ('explore_data', "Explore the listings and save cleaned data"),
+    'charts': ('generate_charts', "Generate business insight charts"),
+    'export': ('listing_io', "Convert the listings file to another format"),
+    'stats': ('market_cube', "Print market statistics from the materialized cube"),
+    'serve': ('api_server', "Serve listings over a local HTTP API"),
+}
+
+
+# Top-level options that take a value
+VALUE_OPTIONS = {'--profile-dir', '--profile-top'}
+
+
+def requested_command(argv):
+    """Return the subcommand named on the command line, if any"""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in COMMANDS:
+            return arg
+        if arg in VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith('-'):
+            return None
+    return None
+
+
+def build_parser(argv):
+    """
+    Build the argument parser, importing only the requested subcommand's module
+
+    Args:
+        argv: Command-line arguments (without the program name)
+
+    Returns:
+        Tuple of parser and the imported module (None if no subcommand was given)
+    """
+    parser = argparse.ArgumentParser(prog='xidmetler', description="Xidmetler.az scraping and analysis tools")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile each scraper/chart stage with cProfile and tracemalloc")
+    parser.add_argument('--profile-dir', default='profiles', help="Directory for profile output")
+    parser.add_argument('--profile-top', type=int, default=15,
+                        help="Hot functions listed per stage in the profile report")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    command = requested_command(argv)
+    module = None
+    for name, (module_name, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        if name == command:
+            module = importlib.import_module(module_name)
+            module.add_arguments(subparser)
+    return parser, module
+
+
+def main(argv=None):
+    """Main execution function"""
+    argv = sys.argv[1:] if argv is None else argv
+    parser, module = build_parser(argv)
+    args = parser.parse_args(argv)
+    if module is None:
+        parser.print_help()
+        return 1
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not args.profile:
+        module.run(args)
+        return 0
+
+    from profiling import profiler
+    profiler.enable(args.profile_dir)
+    try:
+        module.run(args)
+    finally:
+        print(profiler.report(args.profile_top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
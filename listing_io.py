@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Listing I/O
+Compressed JSONL/CSV writers and streaming readers for scraped listings
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# CSV column order shared by every CSV writer
+CSV_FIELDS = [
+    'id', 'listing_code', 'title', 'url', 'price',
+    'contact_name', 'phone', 'location', 'date',
+    'categories', 'description', 'image_url', 'images'
+]
+
+# Fields stored as lists in JSON and as comma-separated strings in CSV
+LIST_FIELDS = ('categories', 'images')
+
+# Listing data files; on equal modification times the earlier (more compact) one wins
+LISTING_FILES = [
+    'xidmetler_listings.jsonl.zst', 'xidmetler_listings.jsonl.gz', 'xidmetler_listings.json',
+    'xidmetler_listings.csv.zst', 'xidmetler_listings.csv.gz', 'xidmetler_listings.csv'
+]
+CLEANED_CSV_FILES = ['xidmetler_listings_cleaned.csv.gz', 'xidmetler_listings_cleaned.csv']
+
+
+def open_text(filename: str, mode: str = 'r'):
+    """
+    Open a text file, compressing or decompressing based on its extension
+
+    Args:
+        filename: Path ending in .gz, .zst or anything else for plain text
+        mode: 'r' or 'w'
+
+    Returns:
+        Text file object
+    """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't', encoding='utf-8', newline='')
+
+    if filename.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is required for .zst files (pip install zstandard)")
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(open(filename, 'wb'))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'))
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    return open(filename, mode, encoding='utf-8', newline='')
+
+
+def _base_name(filename: str) -> str:
+    """Return the filename without its compression extension"""
+    for suffix in ('.gz', '.zst'):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def companion_file(filename: str) -> str:
+    """Return the file the scraper writes alongside filename (JSON/JSONL <-> CSV, same compression)"""
+    base = _base_name(filename)
+    suffix = filename[len(base):]
+    stem, extension = os.path.splitext(base)
+    if extension == '.csv':
+        return f"{stem}.jsonl{suffix}" if suffix else f"{stem}.json"
+    return f"{stem}.csv{suffix}"
+
+
+def find_listings_file(candidates: Optional[List[str]] = None) -> str:
+    """
+    Return the most recently modified existing file among candidates
+
+    Args:
+        candidates: Files to choose from (defaults to LISTING_FILES)
+
+    Returns:
+        Newest existing file, or the last candidate if none exists
+    """
+    candidates = candidates or LISTING_FILES
+    existing = [f for f in candidates if os.path.exists(f)]
+    if not existing:
+        return candidates[-1]
+    # max() keeps the first of equally new files, i.e. the more compact format
+    return max(existing, key=lambda f: os.stat(f).st_mtime_ns)
+
+
+def strip_placeholders(listing: Dict) -> Dict:
+    """Return a copy of a listing without inline data: URI placeholder images"""
+    row = dict(listing)
+    if str(row.get('image_url') or '').startswith('data:'):
+        row['image_url'] = None
+    return row
+
+
+def flatten(listing: Dict) -> Dict:
+    """Convert list fields to comma-separated strings for CSV"""
+    row = dict(listing)
+    for field in LIST_FIELDS:
+        if isinstance(row.get(field), list):
+            row[field] = ', '.join(row[field])
+    return row
+
+
+def _restore(row: Dict) -> Dict:
+    """Convert a CSV row back to a listing dictionary"""
+    listing = {k: (v if v != '' else None) for k, v in row.items()}
+    for field in LIST_FIELDS:
+        if isinstance(listing.get(field), str):
+            listing[field] = [v.strip() for v in listing[field].split(',') if v.strip()]
+        elif listing.get(field) is None and field in listing:
+            listing[field] = []
+    return listing
+
+
+def write_jsonl(listings: Iterable[Dict], filename: str) -> int:
+    """
+    Write listings as one JSON object per line
+
+    Args:
+        listings: Iterable of listing dictionaries
+        filename: Output path (.gz / .zst for compression)
+
+    Returns:
+        Number of listings written
+    """
+    count = 0
+    with open_text(filename, 'w') as f:
+        for listing in listings:
+            f.write(json.dumps(strip_placeholders(listing), ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def _write_csv_rows(f, listings: Iterable[Dict], fieldnames: List[str]) -> int:
+    """Write listings as CSV rows to an open text file"""
+    writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for listing in listings:
+        writer.writerow(flatten(strip_placeholders(listing)))
+        count += 1
+    return count
+
+
+def write_csv(listings: Iterable[Dict], filename: str, fieldnames: List[str] = CSV_FIELDS) -> int:
+    """
+    Write listings as CSV
+
+    Args:
+        listings: Iterable of listing dictionaries
+        filename: Output path (.gz / .zst for compression)
+        fieldnames: CSV columns
+
+    Returns:
+        Number of listings written
+    """
+    with open_text(filename, 'w') as f:
+        return _write_csv_rows(f, listings, fieldnames)
+
+
+def write_listings(listings: List[Dict], filename: str) -> int:
+    """
+    Write listings in the format implied by the filename
+
+    Args:
+        listings: Listing dictionaries
+        filename: .json (legacy pretty-printed), .jsonl or .csv, optionally .gz / .zst
+
+    Returns:
+        Number of listings written
+    """
+    base = _base_name(filename)
+    if base.endswith('.csv'):
+        return write_csv(listings, filename)
+    if base.endswith('.jsonl'):
+        return write_jsonl(listings, filename)
+
+    with open_text(filename, 'w') as f:
+        json.dump(listings, f, ensure_ascii=False, indent=2)
+    return len(listings)
+
+
+def iter_listings(filename: str) -> Iterator[Dict]:
+    """
+    Stream listings from any supported file, one dictionary at a time
+
+    Supports .json (loaded whole), .jsonl and .csv, each optionally .gz / .zst
+    compressed. List fields are returned as lists regardless of format.
+
+    Args:
+        filename: Input path
+
+    Yields:
+        Listing dictionaries
+    """
+    base = _base_name(filename)
+
+    with open_text(filename, 'r') as f:
+        if base.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif base.endswith('.csv'):
+            for row in csv.DictReader(f):
+                yield _restore(row)
+        else:
+            yield from json.load(f)
+
+
+def read_dataframe(filename: str):
+    """
+    Load listings into a pandas DataFrame with flat columns
+
+    CSV input is parsed by pandas directly from the (decompressed) stream.
+    Other formats are streamed through the CSV writer first, so every format
+    yields the same columns, dtypes and missing-value handling.
+
+    Args:
+        filename: Input path
+
+    Returns:
+        pandas DataFrame
+    """
+    import pandas as pd
+
+    if _base_name(filename).endswith('.csv'):
+        with open_text(filename, 'r') as f:
+            return pd.read_csv(f)
+
+    buffer = io.StringIO()
+    _write_csv_rows(buffer, iter_listings(filename), CSV_FIELDS)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def convert(source: str, destination: str) -> int:
+    """Convert a listings file between formats, streaming row by row"""
+    base = _base_name(destination)
+    if base.endswith('.csv'):
+        count = write_csv(iter_listings(source), destination)
+    elif base.endswith('.jsonl'):
+        count = write_jsonl(iter_listings(source), destination)
+    else:
+        count = write_listings(list(iter_listings(source)), destination)
+    logger.info(f"Converted {count} listings from {source} to {destination}")
+    return count
+
+
+def add_arguments(parser):
+    """Register the command-line options"""
+    parser.add_argument('destination', help="Output file (.json, .jsonl or .csv, optionally .gz / .zst)")
+    parser.add_argument('--source', help="Listings file (defaults to the most recently written one)")
+
+
+def run(args):
+    """Run with parsed command-line options"""
+    convert(args.source or find_listings_file(), args.destination)
+
+
+def main():
+    """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a listings file between formats")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Load test for the local query API
+Replays a mix of listing, filter and stats requests and reports latency percentiles
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.client import HTTPConnection
+from typing import Dict, List
+from urllib.parse import quote
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of a list of values by nearest rank"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_paths(host: str, port: int) -> List[str]:
+    """Build a request mix from the data the server is actually serving"""
+    conn = HTTPConnection(host, port, timeout=30)
+    conn.request('GET', '/listings?per_page=200')
+    listings = json.loads(conn.getresponse().read())['results']
+    conn.close()
+
+    paths = ['/stats', '/listings', '/cube', '/cube?category=Ustalar']
+    for listing in listings[:100]:
+        paths.append(f"/listings/{listing['id']}")
+    for location in {l.get('location') for l in listings if l.get('location')}:
+        paths.append(f"/listings?location={quote(location)}&page=2")
+    for segment in ('Budget (0-50 AZN)', 'Mid-Range (51-100 AZN)', 'Premium (101-200 AZN)'):
+        paths.append(f"/listings?segment={quote(segment)}")
+    paths.append('/listings?min_price=50&max_price=200&per_page=50')
+    return paths
+
+
+def worker(host: str, port: int, paths: List[str], requests: int, revalidate: bool,
+           latencies: List[float], statuses: Dict[int, int], lock: threading.Lock):
+    """Issue requests over one keep-alive connection and record latencies"""
+    conn = HTTPConnection(host, port, timeout=30)
+    etags: Dict[str, str] = {}
+    local_latencies = []
+    local_statuses: Dict[int, int] = {}
+
+    for _ in range(requests):
+        path = random.choice(paths)
+        headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        local_latencies.append(time.perf_counter() - start)
+
+        local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        for status, count in local_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Load test the local query API")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per worker")
+    parser.add_argument('--revalidate', action='store_true',
+                        help="Send If-None-Match with previously seen ETags")
+    args = parser.parse_args()
+
+    paths = build_paths(args.host, args.port)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    threads = [
+        threading.Thread(target=worker, args=(args.host, args.port, paths, args.requests,
+                                              args.revalidate, latencies, statuses, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"Requests:   {len(latencies):,} in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"Statuses:   {dict(sorted(statuses.items()))}")
+    print(f"p50:        {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"p99:        {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"max:        {max(latencies) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Market Cube
+Materialized location x category x price-segment x month aggregates for dashboards
+"""
+
+import gzip
+import itertools
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from listing_io import find_listings_file, iter_listings
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ('location', 'category', 'segment', 'month')
+
+# Wildcard value for a rolled-up dimension
+ALL = '*'
+
+# Price tiers, matching the market segmentation chart
+SEGMENTS = [
+    (50, 'Budget (0-50 AZN)'),
+    (100, 'Mid-Range (51-100 AZN)'),
+    (200, 'Premium (101-200 AZN)'),
+    (math.inf, 'Luxury (200+ AZN)')
+]
+
+
+def parse_price(price) -> Optional[float]:
+    """Extract the numeric price from a scraped price string (e.g. '150 Azn')"""
+    match = re.search(r'(\d+)', str(price)) if price is not None else None
+    return float(match.group(1)) if match else None
+
+
+def price_segment(price: Optional[float]) -> str:
+    """Return the market segment label for a numeric price"""
+    if price is None:
+        return 'Unknown'
+    for upper, label in SEGMENTS:
+        if price <= upper:
+            return label
+    return 'Unknown'
+
+
+def main_category(categories) -> str:
+    """Return the main category (first part before comma) of a listing"""
+    if isinstance(categories, list):
+        categories = categories[0] if categories else ''
+    first = str(categories or '').split(',')[0].strip()
+    return first if first and first not in ('N/A', 'nan') else 'Uncategorized'
+
+
+def listing_month(date) -> str:
+    """Return the YYYY-MM month of a dd.mm.YYYY listing date"""
+    match = re.match(r'\s*(\d{1,2})\.(\d{1,2})\.(\d{4})', str(date or ''))
+    return f"{match.group(3)}-{int(match.group(2)):02d}" if match else 'Unknown'
+
+
+def listing_key(listing: Dict) -> Tuple[Tuple[str, ...], Optional[float]]:
+    """Return the cube coordinates and numeric price of a listing"""
+    price = parse_price(listing.get('price'))
+    location = listing.get('location') or 'N/A'
+    return (
+        (str(location), main_category(listing.get('categories')), price_segment(price),
+         listing_month(listing.get('date'))),
+        price
+    )
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error
+
+    Values are counted in logarithmic buckets, so any quantile is returned
+    within `alpha` relative error of the exact value and sketches from
+    different cells can be merged by adding bucket counts.
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        """Initialize an empty sketch with relative accuracy alpha"""
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float):
+        """Add a non-negative value to the sketch"""
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: 'QuantileSketch'):
+        """Merge another sketch with the same alpha into this one"""
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the approximate q-quantile (0 <= q <= 1), or None if empty"""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_list(self) -> List:
+        """Serialize the sketch compactly"""
+        return [self.zero_count, sorted(self.buckets.items())]
+
+    @classmethod
+    def from_list(cls, data: List, alpha: float) -> 'QuantileSketch':
+        """Restore a sketch serialized with to_list"""
+        sketch = cls(alpha)
+        sketch.zero_count = data[0]
+        sketch.buckets = {int(index): count for index, count in data[1]}
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+
+class CubeCell:
+    """Aggregates for one cube cell: listing count plus price count, sum, min, max and sketch"""
+
+    def __init__(self, alpha: float = 0.01):
+        """Initialize an empty cell"""
+        self.count = 0
+        self.price_sum = 0.0
+        self.price_min = None
+        self.price_max = None
+        self.sketch = QuantileSketch(alpha)
+
+    @property
+    def priced(self) -> int:
+        """Number of listings in the cell with a numeric price"""
+        return self.sketch.count
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Average price of the priced listings in the cell"""
+        return self.price_sum / self.priced if self.priced else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate price quantile of the cell"""
+        return self.sketch.quantile(q)
+
+    def add(self, price: Optional[float]):
+        """Add one listing with an optional numeric price"""
+        self.count += 1
+        if price is None:
+            return
+        self.price_sum += price
+        self.price_min = price if self.price_min is None else min(self.price_min, price)
+        self.price_max = price if self.price_max is None else max(self.price_max, price)
+        self.sketch.add(price)
+
+    def merge(self, other: 'CubeCell'):
+        """Merge another cell into this one"""
+        self.count += other.count
+        self.price_sum += other.price_sum
+        for value in (other.price_min, other.price_max):
+            if value is not None:
+                self.price_min = value if self.price_min is None else min(self.price_min, value)
+                self.price_max = value if self.price_max is None else max(self.price_max, value)
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self) -> Dict:
+        """Return the cell's aggregates as a plain dictionary"""
+        return {
+            'count': self.count,
+            'priced': self.priced,
+            'sum': self.price_sum,
+            'mean': self.mean,
+            'min': self.price_min,
+            'max': self.price_max,
+            'median': self.quantile(0.5),
+            'p25': self.quantile(0.25),
+            'p75': self.quantile(0.75)
+        }
+
+
+class MarketCube:
+    """
+    Fully materialized OLAP cube over (location, category, segment, month)
+
+    Every roll-up (any dimension replaced by ALL) is precomputed at build
+    time, so each query is a single dictionary lookup.
+    """
+
+    DEFAULT_FILE = "xidmetler_cube.json.gz"
+
+    def __init__(self, alpha: float = 0.01):
+        """Initialize an empty cube"""
+        self.alpha = alpha
+        self.cells: Dict[Tuple[str, ...], CubeCell] = {}
+        self.built_at = 0.0
+
+    @classmethod
+    def build(cls, listings: Iterable[Dict], alpha: float = 0.01) -> 'MarketCube':
+        """
+        Build the cube, including all roll-ups, from listing dictionaries
+
+        Listings repeated across pages (same ID) are counted once.
+
+        Args:
+            listings: Iterable of listing dictionaries as produced by the scraper
+            alpha: Relative accuracy of the price quantile sketches
+
+        Returns:
+            MarketCube instance
+        """
+        cube = cls(alpha)
+        base: Dict[Tuple[str, ...], CubeCell] = {}
+        seen_ids = set()
+        for listing in listings:
+            listing_id = str(listing.get('id') or '')
+            if listing_id:
+                if listing_id in seen_ids:
+                    continue
+                seen_ids.add(listing_id)
+
+            key, price = listing_key(listing)
+            if key not in base:
+                base[key] = CubeCell(alpha)
+            base[key].add(price)
+
+        # Merge each base cell into all 2^4 roll-ups it contributes to
+        masks = list(itertools.product((False, True), repeat=len(DIMENSIONS)))
+        for key, cell in base.items():
+            for mask in masks:
+                rolled = tuple(ALL if rolled_up else value for value, rolled_up in zip(key, mask))
+                if rolled not in cube.cells:
+                    cube.cells[rolled] = CubeCell(alpha)
+                cube.cells[rolled].merge(cell)
+
+        cube.built_at = time.time()
+        logger.info(f"Built cube with {len(base)} base cells and {len(cube.cells)} total cells")
+        return cube
+
+    def query(self, location: str = ALL, category: str = ALL,
+              segment: str = ALL, month: str = ALL) -> Optional[CubeCell]:
+        """
+        Return the aggregates for a slice; omitted dimensions are rolled up
+
+        Args:
+            location: Location value or ALL
+            category: Main category value or ALL
+            segment: Price segment label or ALL
+            month: YYYY-MM month or ALL
+
+        Returns:
+            CubeCell or None if the slice is empty
+        """
+        return self.cells.get((location, category, segment, month))
+
+    def members(self, dimension: str) -> List[str]:
+        """Return the distinct values of a dimension"""
+        position = DIMENSIONS.index(dimension)
+        return sorted({key[position] for key in self.cells if key[position] != ALL})
+
+    def breakdown(self, dimension: str, **filters) -> Dict[str, CubeCell]:
+        """
+        Return one cell per value of a dimension within a slice
+
+        Args:
+            dimension: Dimension to group by
+            **filters: Fixed values for other dimensions
+
+        Returns:
+            Dictionary mapping dimension value to CubeCell
+        """
+        result = {}
+        for value in self.members(dimension):
+            cell = self.query(**{**filters, dimension: value})
+            if cell:
+                result[value] = cell
+        return result
+
+    def save(self, filename: str = DEFAULT_FILE):
+        """Write the cube to a gzip-compressed JSON file"""
+        try:
+            data = {
+                'dimensions': DIMENSIONS,
+                'alpha': self.alpha,
+                'built_at': self.built_at,
+                'cells': [
+                    [list(key), cell.count, cell.price_sum, cell.price_min, cell.price_max,
+                     cell.sketch.to_list()]
+                    for key, cell in self.cells.items()
+                ]
+            }
+            with gzip.open(filename, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            logger.info(f"Saved cube with {len(self.cells)} cells to {filename}")
+        except Exception as e:
+            logger.error(f"Error saving cube: {e}")
+
+    @classmethod
+    def load(cls, filename: str = DEFAULT_FILE) -> 'MarketCube':
+        """Load a cube written by save"""
+        with gzip.open(filename, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+
+        cube = cls(data['alpha'])
+        cube.built_at = data['built_at']
+        for key, count, price_sum, price_min, price_max, sketch in data['cells']:
+            cell = CubeCell(cube.alpha)
+            cell.count = count
+            cell.price_sum = price_sum
+            cell.price_min = price_min
+            cell.price_max = price_max
+            cell.sketch = QuantileSketch.from_list(sketch, cube.alpha)
+            cube.cells[tuple(key)] = cell
+        return cube
+
+
+def build_cube(listings_file: Optional[str] = None,
+               cube_file: str = MarketCube.DEFAULT_FILE) -> MarketCube:
+    """Rebuild the cube from a listings file (defaults to the most recently written one)"""
+    cube = MarketCube.build(iter_listings(listings_file or find_listings_file()))
+    cube.save(cube_file)
+    return cube
+
+
+def load_or_build(listings_file: Optional[str] = None,
+                  cube_file: str = MarketCube.DEFAULT_FILE) -> MarketCube:
+    """Load the saved cube, rebuilding it first if the listings file is newer"""
+    listings_file = listings_file or find_listings_file()
+    if os.path.exists(cube_file) and (
+            not os.path.exists(listings_file)
+            or os.path.getmtime(cube_file) >= os.path.getmtime(listings_file)):
+        return MarketCube.load(cube_file)
+    return build_cube(listings_file, cube_file)
+
+
+def add_arguments(parser):
+    """Register the command-line options"""
+    parser.add_argument('--data', help="Listings file (defaults to the most recently written one)")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the cube even if it is current")
+    for dimension in DIMENSIONS:
+        parser.add_argument(f'--{dimension}', default=ALL, help=f"Restrict to one {dimension}")
+
+
+def run(args):
+    """Print summary statistics for a cube slice, without loading the listings"""
+    from seller_index import SellerIndex
+
+    if args.rebuild:
+        cube = build_cube(args.data)
+    else:
+        cube = load_or_build(args.data)
+
+    filters = {d: getattr(args, d) for d in DIMENSIONS}
+    cell = cube.query(**filters)
+    if not cell:
+        print("No listings in this slice")
+        return
+
+    categories = cube.breakdown('category', **{k: v for k, v in filters.items() if k != 'category'})
+    top_category = max(categories.items(), key=lambda item: item[1].count) if categories else None
+    baku = cube.query(**{**filters, 'location': 'Bakı şəhəri'}) if args.location == ALL else None
+
+    print("XIDMETLER.AZ MARKETPLACE - KEY BUSINESS METRICS")
+    print("=" * 60)
+    print(f"Total Listings: {cell.count}")
+    if cell.priced:
+        print(f"Average Price (AZN): {cell.mean:.2f}")
+        print(f"Median Price (AZN): {cell.quantile(0.5):.2f}")
+        print(f"Price Range: {cell.price_min:.0f} - {cell.price_max:.0f} AZN")
+    print(f"Total Categories: {len(categories)}")
+    if baku:
+        print(f"Listings in Baku: {baku.count}")
+    for segment, segment_cell in cube.breakdown('segment', **{k: v for k, v in filters.items() if k != 'segment'}).items():
+        print(f"{segment}: {segment_cell.count}")
+    if top_category:
+        print(f"Top Category: {top_category[0]}")
+        print(f"Top Category Volume: {top_category[1].count}")
+
+    if os.path.exists(SellerIndex.DEFAULT_FILE):
+        sellers = SellerIndex.load()
+        if args.category != ALL:
+            print(f"Sellers in {args.category}: {sellers.sellers_in_category(args.category)}")
+        else:
+            print(f"Unique Sellers: {len(sellers.sellers)}")
+
+
+def main():
+    """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print market statistics from the materialized cube")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
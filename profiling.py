@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Stage Profiling
+Opt-in cProfile and tracemalloc hooks around scraper and chart stages
+"""
+
+import cProfile
+import functools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfiler:
+    """
+    Collects per-stage CPU profiles and memory peaks
+
+    Stages may nest (e.g. the phone AJAX call inside detail parsing): the
+    outer stage's profiler is paused while the inner one runs, so profiles
+    are exclusive. Each thread profiles into its own cProfile.Profile, and
+    these are merged per stage in the report. On Python 3.12+ only one
+    cProfile profiler can be active per process and it sees every thread's
+    calls; invocations that start while another thread is profiling record
+    wall time and memory only.
+    tracemalloc peaks are process-wide, so with parallel category crawls a
+    stage's peak includes allocations made concurrently by other threads.
+
+    Disabled by default; stage() costs one attribute check until enable() is called.
+    """
+
+    def __init__(self):
+        """Initialize a disabled profiler"""
+        self.enabled = False
+        self.output_dir = None
+        self.trace_memory = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles: Dict[str, List[cProfile.Profile]] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+
+    def enable(self, output_dir: str = "profiles", trace_memory: bool = True):
+        """
+        Start collecting stage profiles
+
+        Args:
+            output_dir: Directory for the per-run profile output
+            trace_memory: Also record tracemalloc peaks and snapshots
+        """
+        self.output_dir = os.path.join(output_dir, time.strftime('%Y%m%d-%H%M%S'))
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+        logger.info(f"Profiling enabled, writing to {self.output_dir}")
+
+    def _thread_profile(self, name: str) -> cProfile.Profile:
+        """Return this thread's profile for a stage, creating it on first use"""
+        profiles = self._local.__dict__.setdefault('profiles', {})
+        if name not in profiles:
+            profiles[name] = cProfile.Profile()
+            with self._lock:
+                self._profiles.setdefault(name, []).append(profiles[name])
+        return profiles[name]
+
+    def _enable(self, profile: cProfile.Profile) -> bool:
+        """Enable a profile, returning False if another profiler holds the process-wide slot"""
+        try:
+            profile.enable()
+            return True
+        except ValueError:
+            return False
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile the enclosed block as one invocation of a stage
+
+        Args:
+            name: Stage name (e.g. 'detail_parse', 'chart_market_composition')
+        """
+        if not self.enabled:
+            yield
+            return
+
+        # Stack entries are [active profile or None, absolute peak seen before the current nested stage, memory at entry]
+        stack = self._local.__dict__.setdefault('stack', [])
+        if stack:
+            if stack[-1][0]:
+                stack[-1][0].disable()
+            if self.trace_memory:
+                stack[-1][1] = max(stack[-1][1], tracemalloc.get_traced_memory()[1])
+        base = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        entry = [None, 0, base]
+        stack.append(entry)
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profile = self._thread_profile(name)
+        if self._enable(profile):
+            entry[0] = profile
+        try:
+            yield
+        finally:
+            if entry[0]:
+                entry[0].disable()
+            elapsed = time.perf_counter() - start
+            stack.pop()
+
+            peak = max(entry[1], tracemalloc.get_traced_memory()[1]) if self.trace_memory else 0
+            with self._lock:
+                # Peak is reported as growth over the memory in use when the stage started
+                stats = self._stats.setdefault(name, {'calls': 0, 'unprofiled': 0, 'wall': 0.0, 'peak': 0})
+                stats['calls'] += 1
+                if not entry[0]:
+                    stats['unprofiled'] += 1
+                stats['wall'] += elapsed
+                new_peak = peak - base > stats['peak']
+                stats['peak'] = max(stats['peak'], peak - base)
+            # Keep the allocation snapshot of the invocation with the highest peak
+            if new_peak:
+                self._snapshots[name] = tracemalloc.take_snapshot()
+
+            if stack:
+                # The outer stage's peak must cover this nested one
+                stack[-1][1] = max(stack[-1][1], peak)
+                if stack[-1][0] and not self._enable(stack[-1][0]):
+                    stack[-1][0] = None
+
+    def profiled(self, name: str):
+        """Decorator form of stage()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self, top_n: int = 15) -> Optional[str]:
+        """
+        Write per-stage output and return the hot-function report
+
+        For every stage this writes <stage>.prof (pstats format, loadable by
+        snakeviz, tuna or flameprof for flame graphs) and, when memory is
+        traced, <stage>.mem.txt with the top live allocation sites at the end
+        of the invocation that reached the highest peak.
+
+        Args:
+            top_n: Number of hot functions listed per stage
+
+        Returns:
+            Report text, or None if profiling is disabled
+        """
+        if not self.enabled:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        lines = ["STAGE PROFILE REPORT", "=" * 80]
+        for name, stats in sorted(self._stats.items(), key=lambda item: -item[1]['wall']):
+            lines.append(f"\n{name}: {stats['calls']} calls, {stats['wall']:.3f}s wall, "
+                         f"peak +{stats['peak'] / 1024 / 1024:.1f} MiB")
+            if stats['unprofiled']:
+                lines.append(f"  {stats['unprofiled']} calls without CPU profile (another profiler was active)")
+
+            profiles = self._profiles.get(name, [])
+            merged = None
+            for profile in profiles:
+                try:
+                    if merged is None:
+                        merged = pstats.Stats(profile)
+                    else:
+                        merged.add(profile)
+                except TypeError:
+                    # Profile never collected any calls
+                    continue
+            if merged is None:
+                continue
+
+            merged.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            hot = sorted(merged.stats.items(), key=lambda item: -item[1][2])[:top_n]
+            lines.append(f"  {'tottime':>9} {'cumtime':>9} {'ncalls':>9}  function")
+            for (filename, line, func), (cc, nc, tt, ct, _) in hot:
+                lines.append(f"  {tt:9.4f} {ct:9.4f} {nc:9d}  {os.path.basename(filename)}:{line}({func})")
+
+            snapshot = self._snapshots.get(name)
+            if snapshot:
+                top = snapshot.statistics('lineno')[:top_n]
+                with open(os.path.join(self.output_dir, f"{name}.mem.txt"), 'w', encoding='utf-8') as f:
+                    for stat in top:
+                        f.write(f"{stat}\n")
+
+        text = "\n".join(lines)
+        with open(os.path.join(self.output_dir, "report.txt"), 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        logger.info(f"Wrote stage profiles to {self.output_dir}")
+        return text
+
+
+# Process-wide profiler used by the scraper and chart stages
+profiler = StageProfiler()
+stage = profiler.stage
+profiled = profiler.profiled
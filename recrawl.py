@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Recrawl Scheduler
+Revisits known listings by freshness priority within a fixed per-run request budget
+"""
+
+import argparse
+import heapq
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from listing_io import companion_file, find_listings_file, iter_listings, write_listings
+from seller_index import SellerIndex
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+
+
+class RecrawlScheduler:
+    """
+    Priority queue of known listings ordered by when they are next due
+
+    A listing's revisit interval grows with its age (from the listing date)
+    and shrinks with how often its price has changed, so recent and volatile
+    listings are checked often and stale ones rarely.
+    """
+
+    DEFAULT_FILE = "xidmetler_recrawl_state.json"
+    MIN_INTERVAL = 1 * DAY
+    MAX_INTERVAL = 30 * DAY
+    # Revisit interval as a fraction of the listing's age
+    AGE_FACTOR = 0.25
+
+    def __init__(self, filename: str = DEFAULT_FILE):
+        """Initialize an empty scheduler backed by filename"""
+        self.filename = filename
+        self.state: Dict[str, Dict] = {}
+        self._queue: List = []
+
+    @classmethod
+    def load(cls, filename: str = DEFAULT_FILE) -> 'RecrawlScheduler':
+        """Load scheduler state from disk, or return an empty scheduler"""
+        scheduler = cls(filename)
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    scheduler.state = json.load(f)
+            except Exception as e:
+                logger.error(f"Error loading recrawl state from {filename}: {e}")
+
+        scheduler._queue = [(entry['next_due'], listing_id)
+                            for listing_id, entry in scheduler.state.items()
+                            if entry['status'] == 'active']
+        heapq.heapify(scheduler._queue)
+        return scheduler
+
+    def save(self):
+        """Write scheduler state to disk"""
+        try:
+            with open(self.filename, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            logger.info(f"Saved recrawl state for {len(self.state)} listings to {self.filename}")
+        except Exception as e:
+            logger.error(f"Error saving recrawl state: {e}")
+
+    def interval(self, entry: Dict, now: float) -> float:
+        """
+        Return the revisit interval for a listing
+
+        Args:
+            entry: Scheduler state of the listing
+            now: Current timestamp
+
+        Returns:
+            Interval in seconds
+        """
+        try:
+            posted = datetime.strptime(entry['date'], '%d.%m.%Y').timestamp()
+            age = max(now - posted, 0)
+        except (TypeError, ValueError):
+            age = self.MAX_INTERVAL / self.AGE_FACTOR
+
+        # Observed change rate: price changes per check
+        change_rate = entry['changes'] / max(entry['checks'], 1)
+        interval = age * self.AGE_FACTOR / (1 + 4 * change_rate)
+        return min(max(interval, self.MIN_INTERVAL), self.MAX_INTERVAL)
+
+    def _schedule(self, listing_id: str, now: float):
+        """Compute and enqueue the next due time of a listing"""
+        entry = self.state[listing_id]
+        entry['next_due'] = now + self.interval(entry, now)
+        heapq.heappush(self._queue, (entry['next_due'], listing_id))
+
+    def seed(self, listings: Iterable[Dict], now: Optional[float] = None) -> int:
+        """
+        Register listings not yet known to the scheduler
+
+        Listings are assumed fresh when seeded (they were just scraped).
+
+        Args:
+            listings: Listing dictionaries
+            now: Timestamp to seed with (defaults to the current time)
+
+        Returns:
+            Number of newly registered listings
+        """
+        now = now or time.time()
+        added = 0
+        for listing in listings:
+            listing_id = str(listing.get('id') or '')
+            if not listing_id or listing_id in self.state or not listing.get('url'):
+                continue
+
+            self.state[listing_id] = {
+                'url': listing['url'],
+                'price': listing.get('price'),
+                'date': listing.get('date'),
+                'status': 'active',
+                'last_checked': now,
+                'checks': 0,
+                'changes': 0,
+                'next_due': now
+            }
+            self._schedule(listing_id, now)
+            added += 1
+        return added
+
+    def observe(self, listings: Iterable[Dict], now: Optional[float] = None) -> int:
+        """
+        Record freshly scraped listings, registering unknown ones
+
+        A scrape counts as a check of every known listing it contains: price
+        and date are refreshed, listings marked removed become active again,
+        and each listing is rescheduled.
+
+        Args:
+            listings: Listing dictionaries scraped this run
+            now: Timestamp of the scrape (defaults to the current time)
+
+        Returns:
+            Number of known listings refreshed
+        """
+        now = now or time.time()
+        listings = list(listings)
+        refreshed = set()
+        for listing in listings:
+            listing_id = str(listing.get('id') or '')
+            entry = self.state.get(listing_id)
+            if not entry or listing_id in refreshed:
+                continue
+
+            entry['status'] = 'active'
+            entry.pop('removed_at', None)
+            entry['url'] = listing.get('url') or entry['url']
+            self.record(listing_id, {'removed': False, 'price': listing.get('price'),
+                                     'date': listing.get('date')}, now)
+            refreshed.add(listing_id)
+
+        self.seed(listings, now)
+        return len(refreshed)
+
+    def due(self, budget: int, now: Optional[float] = None) -> List[str]:
+        """
+        Pop up to budget listing IDs whose revisit time has passed, most overdue first
+
+        Args:
+            budget: Maximum number of listings to return
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            List of listing IDs
+        """
+        now = now or time.time()
+        selected = []
+        while self._queue and len(selected) < budget:
+            next_due, listing_id = self._queue[0]
+            if next_due > now:
+                break
+            heapq.heappop(self._queue)
+
+            # Skip queue entries superseded by a reschedule or removal
+            entry = self.state.get(listing_id)
+            if entry and entry['status'] == 'active' and entry['next_due'] == next_due:
+                selected.append(listing_id)
+        return selected
+
+    def record(self, listing_id: str, result: Optional[Dict], now: Optional[float] = None) -> Optional[str]:
+        """
+        Record the outcome of a check and reschedule the listing
+
+        Args:
+            listing_id: ID of the checked listing
+            result: Result of XidmetlerScraper.check_listing (None if the request failed)
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            'removed', 'price_changed', 'unchanged' or None if the check failed
+        """
+        now = now or time.time()
+        entry = self.state[listing_id]
+
+        if result is None:
+            # Transient failure: retry after the minimum interval
+            entry['next_due'] = now + self.MIN_INTERVAL
+            heapq.heappush(self._queue, (entry['next_due'], listing_id))
+            return None
+
+        entry['checks'] += 1
+        entry['last_checked'] = now
+        if result['removed']:
+            entry['status'] = 'removed'
+            entry['removed_at'] = now
+            return 'removed'
+
+        outcome = 'unchanged'
+        if result['price'] != entry['price']:
+            entry['previous_price'] = entry['price']
+            entry['price'] = result['price']
+            entry['changes'] += 1
+            entry['last_changed'] = now
+            outcome = 'price_changed'
+        if result['date'] and result['date'] != 'N/A':
+            entry['date'] = result['date']
+
+        self._schedule(listing_id, now)
+        return outcome
+
+    def run(self, scraper, budget: int = 100, delay: float = 1.0) -> Dict[str, List]:
+        """
+        Check up to budget due listings
+
+        Args:
+            scraper: XidmetlerScraper used to fetch detail pages
+            budget: Maximum number of requests for this run
+            delay: Delay between requests in seconds
+
+        Returns:
+            Dictionary with removed IDs, price changes and failed IDs
+        """
+        results = {'checked': [], 'removed': [], 'price_changes': [], 'failed': []}
+        for listing_id in self.due(budget):
+            entry = self.state[listing_id]
+            old_price = entry['price']
+            outcome = self.record(listing_id, scraper.check_listing(entry['url']))
+            time.sleep(delay)
+
+            if outcome is None:
+                results['failed'].append(listing_id)
+                continue
+            results['checked'].append(listing_id)
+            if outcome == 'removed':
+                results['removed'].append(listing_id)
+            elif outcome == 'price_changed':
+                results['price_changes'].append((listing_id, old_price, entry['price']))
+
+        logger.info(f"Checked {len(results['checked'])} listings: {len(results['removed'])} removed, "
+                    f"{len(results['price_changes'])} price changes, {len(results['failed'])} failed")
+        return results
+
+    def apply(self, listings: List[Dict], checked: Iterable[str]) -> List[Dict]:
+        """
+        Bring the listings checked in a run up to date with the scheduler state
+
+        Args:
+            listings: Listing dictionaries
+            checked: IDs of the listings checked in the run
+
+        Returns:
+            Listings without removed ones, with current prices and dates for checked ones
+        """
+        checked = set(checked)
+        updated = []
+        for listing in listings:
+            listing_id = str(listing.get('id'))
+            entry = self.state.get(listing_id) if listing_id in checked else None
+            if entry and entry['status'] == 'removed':
+                continue
+            if entry:
+                listing = {**listing, 'price': entry['price'], 'date': entry['date'] or listing.get('date')}
+            updated.append(listing)
+        return updated
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Register the command-line options"""
+    parser.add_argument('--data', help="Listings file to refresh (defaults to the most recently written one)")
+    parser.add_argument('--budget', type=int, default=100, help="Maximum detail requests this run")
+    parser.add_argument('--delay', type=float, default=1.5, help="Delay between requests in seconds")
+
+
+def run(args: argparse.Namespace):
+    """Run with parsed command-line options"""
+    from scraper import XidmetlerScraper
+
+    data_file = args.data or find_listings_file()
+    listings = list(iter_listings(data_file))
+
+    scheduler = RecrawlScheduler.load()
+    added = scheduler.seed(listings)
+    logger.info(f"Registered {added} new listings, {len(scheduler.state)} known")
+
+    results = scheduler.run(XidmetlerScraper(), budget=args.budget, delay=args.delay)
+    scheduler.save()
+
+    if results['removed'] or results['price_changes']:
+        refreshed = scheduler.apply(listings, results['checked'])
+        # Rewrite the CSV (or JSON) saved alongside first, so data_file stays the newest
+        for filename in (companion_file(data_file), data_file):
+            if filename == data_file or os.path.exists(filename):
+                write_listings(refreshed, filename)
+                logger.info(f"Wrote {len(refreshed)} listings to {filename}")
+
+    if results['removed']:
+        index = SellerIndex.load()
+        detached = sum(1 for listing_id in results['removed'] if index.remove_listing(listing_id))
+        index.save()
+        logger.info(f"Removed {detached} listings from the seller index")
+
+    for listing_id, old_price, new_price in results['price_changes']:
+        logger.info(f"Price change {listing_id}: {old_price} -> {new_price}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Recrawl due listings within a request budget")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
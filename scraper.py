@@ -7,13 +7,22 @@ Scrapes listings from pages 1-50 and extracts detailed information including pho
 import requests
 from bs4 import BeautifulSoup
 import json
-import csv
 import time
 import re
-from typing import List, Dict, Optional
-from urllib.parse import urljoin
+import os
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Set
+from urllib.parse import urljoin, urlparse
 import logging
 
+from seller_index import SellerIndex
+from market_cube import MarketCube
+from listing_io import find_listings_file, iter_listings, write_csv, write_jsonl
+from recrawl import RecrawlScheduler
+from profiling import profiled, stage
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,12 +31,31 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def combine_paths(paths) -> List[str]:
+    """Combine category paths into one list of unique levels, keeping their order"""
+    combined = []
+    for path in paths:
+        for name in path:
+            if name and name not in combined:
+                combined.append(name)
+    return combined
+
+
 class XidmetlerScraper:
     """Scraper for xidmetler.az website"""
 
     BASE_URL = "https://xidmetler.az"
     LISTING_URL = f"{BASE_URL}/homelist/"
     AJAX_URL = f"{BASE_URL}/ajax.php"
+    CATEGORY_CACHE_FILE = "xidmetler_categories.json"
+    # Consecutive listing page failures after which a category partition is abandoned
+    MAX_PAGE_FAILURES = 3
+
+    # Single-segment paths on the site that are not service categories
+    NON_CATEGORY_SLUGS = {
+        'homelist', 'login', 'register', 'logout', 'elan-yerlesdir', 'elaqe',
+        'haqqimizda', 'qaydalar', 'axtaris', 'search', 'profile', 'ajax.php'
+    }
 
     def __init__(self):
         """Initialize the scraper with session and headers"""
@@ -36,19 +64,23 @@ class XidmetlerScraper:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
         })
         self.all_listings = []
+        # Category names covered by the partitions crawled this run
+        self.crawled_categories: Set[str] = set()
 
-    def get_listing_page(self, page_num: int) -> Optional[BeautifulSoup]:
+    @profiled('listing_fetch')
+    def get_listing_page(self, page_num: int, base_url: Optional[str] = None) -> Optional[BeautifulSoup]:
         """
         Fetch a listing page by page number
 
         Args:
             page_num: Page number to fetch (0-indexed for start parameter)
+            base_url: Listing URL to paginate (defaults to the home listing)
 
         Returns:
             BeautifulSoup object or None if request fails
         """
         try:
-            url = f"{self.LISTING_URL}?start={page_num}"
+            url = f"{base_url or self.LISTING_URL}?start={page_num}"
             logger.info(f"Fetching listing page: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
@@ -97,7 +129,12 @@ class XidmetlerScraper:
 
                 # Extract image
                 img_tag = div.find('img')
-                image_url = urljoin(self.BASE_URL, img_tag['src']) if img_tag and img_tag.get('src') else None
+                # Lazy-loaded images carry an inline data: placeholder in src
+                image_src = None
+                if img_tag:
+                    image_src = next((img_tag.get(attr) for attr in ('data-src', 'data-original', 'src')
+                                      if img_tag.get(attr) and not img_tag.get(attr).startswith('data:')), None)
+                image_url = urljoin(self.BASE_URL, image_src) if image_src else None
 
                 # Extract price
                 price_tag = div.find('span', {'class': 'sprice'})
@@ -118,6 +155,7 @@ class XidmetlerScraper:
 
         return listings
 
+    @profiled('phone_ajax')
     def get_phone_number(self, listing_id: str, hash_value: str, referrer: str) -> Optional[str]:
         """
         Get phone number via AJAX request
@@ -164,13 +202,56 @@ class XidmetlerScraper:
 
         return None
 
-    def extract_detail_info(self, listing_url: str, listing_id: str) -> Dict:
+    def _extract_price(self, soup: BeautifulSoup) -> str:
+        """Extract the price text from a detail page"""
+        price_tag = soup.find('span', {'class': 'pricecolor'})
+        return price_tag.get_text(strip=True) if price_tag else "N/A"
+
+    def _extract_date(self, soup: BeautifulSoup) -> str:
+        """Extract the listing date (e.g. 23.10.2025) from a detail page"""
+        date_span = soup.find('span', {'class': 'viewsbb'})
+        if not date_span:
+            return "N/A"
+        date_match = re.search(r'Tarix:\s*(.+)', date_span.get_text(strip=True))
+        return date_match.group(1) if date_match else "N/A"
+
+    def check_listing(self, listing_url: str) -> Optional[Dict]:
+        """
+        Re-check a known listing without the phone AJAX call
+
+        Args:
+            listing_url: URL of the listing detail page
+
+        Returns:
+            Dictionary with 'removed' flag, price and date, or None if the request failed
+        """
+        try:
+            logger.info(f"Checking listing: {listing_url}")
+            response = self.session.get(listing_url, timeout=30)
+
+            # Removed listings return 404/410 or redirect away from the detail page
+            redirected = response.history and not response.url.endswith('.html')
+            if response.status_code in (404, 410) or redirected:
+                return {'removed': True, 'price': None, 'date': None}
+
+            response.raise_for_status()
+            soup = BeautifulSoup(response.content, 'html.parser')
+            return {'removed': False, 'price': self._extract_price(soup), 'date': self._extract_date(soup)}
+        except Exception as e:
+            logger.error(f"Error checking listing {listing_url}: {e}")
+            return None
+
+    @profiled('detail_parse')
+    def extract_detail_info(self, listing_url: str, listing_id: str,
+                            categories: Optional[List[str]] = None) -> Dict:
         """
         Extract detailed information from a listing page
 
         Args:
             listing_url: URL of the listing detail page
             listing_id: ID of the listing
+            categories: Category path already known from the crawl partition.
+                When given, the category link scan on the detail page is skipped.
 
         Returns:
             Dictionary containing detailed listing information
@@ -179,8 +260,9 @@ class XidmetlerScraper:
 
         try:
             logger.info(f"Fetching detail page: {listing_url}")
-            response = self.session.get(listing_url, timeout=30)
-            response.raise_for_status()
+            with stage('detail_fetch'):
+                response = self.session.get(listing_url, timeout=30)
+                response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
 
             # Extract title
@@ -196,18 +278,20 @@ class XidmetlerScraper:
             else:
                 detail_info['listing_code'] = listing_id
 
-            # Extract category
-            article = soup.find('article')
-            if article:
-                category_links = article.find_all('a', href=True)
-                categories = [a.get_text(strip=True) for a in category_links[:2] if '/usta-xidmeti' in a['href'] or '/cam-balkon' in a['href']]
-                detail_info['categories'] = categories if categories else ["N/A"]
+            # Extract category (stamped by the partition when crawling by category)
+            if categories:
+                detail_info['categories'] = list(categories)
             else:
-                detail_info['categories'] = ["N/A"]
+                article = soup.find('article')
+                if article:
+                    category_links = article.find_all('a', href=True)
+                    found = [a.get_text(strip=True) for a in category_links[:2] if '/usta-xidmeti' in a['href'] or '/cam-balkon' in a['href']]
+                    detail_info['categories'] = found if found else ["N/A"]
+                else:
+                    detail_info['categories'] = ["N/A"]
 
             # Extract price
-            price_tag = soup.find('span', {'class': 'pricecolor'})
-            detail_info['price'] = price_tag.get_text(strip=True) if price_tag else "N/A"
+            detail_info['price'] = self._extract_price(soup)
 
             # Extract description
             desc_tag = soup.find('p', {'class': 'infop100 fullteshow'})
@@ -249,13 +333,7 @@ class XidmetlerScraper:
                 detail_info['phone'] = "N/A"
 
             # Extract date
-            date_span = soup.find('span', {'class': 'viewsbb'})
-            if date_span:
-                date_text = date_span.get_text(strip=True)
-                date_match = re.search(r'Tarix:\s*(.+)', date_text)
-                detail_info['date'] = date_match.group(1) if date_match else "N/A"
-            else:
-                detail_info['date'] = "N/A"
+            detail_info['date'] = self._extract_date(soup)
 
             # Extract images
             pics_div = soup.find('div', {'id': 'picsopen'})
@@ -314,6 +392,261 @@ class XidmetlerScraper:
             # Add delay between page requests
             time.sleep(delay)
 
+    def _category_slug(self, href: str) -> Optional[str]:
+        """Return the category slug for a site-internal category link, or None"""
+        parsed = urlparse(urljoin(self.BASE_URL, href))
+        if parsed.netloc != urlparse(self.BASE_URL).netloc or parsed.query:
+            return None
+
+        path = parsed.path.strip('/')
+        if not path or '/' in path or '.' in path or path in self.NON_CATEGORY_SLUGS:
+            return None
+        return path
+
+    def extract_categories(self, soup: BeautifulSoup) -> List[Dict]:
+        """
+        Extract the category tree from the site navigation
+
+        Args:
+            soup: BeautifulSoup object of a page carrying the category menu
+
+        Returns:
+            List of category dictionaries with slug, name, url, parent and path
+        """
+        categories = {}
+
+        for link in soup.find_all('a', href=True):
+            slug = self._category_slug(link['href'])
+            name = link.get_text(strip=True)
+            if not slug or not name or slug in categories:
+                continue
+
+            # The parent is the nearest enclosing menu item that links to another category
+            parent = None
+            for li in link.find_parents('li')[1:]:
+                parent_link = li.find('a', href=True)
+                parent_slug = self._category_slug(parent_link['href']) if parent_link else None
+                if parent_slug and parent_slug != slug:
+                    parent = parent_slug
+                    break
+
+            categories[slug] = {
+                'slug': slug,
+                'name': name,
+                'url': urljoin(self.BASE_URL, f"/{slug}/"),
+                'parent': parent
+            }
+
+        # Resolve the full name path (root first) for each category
+        for category in categories.values():
+            path = [category['name']]
+            parent = category['parent']
+            while parent in categories and len(path) < 10:
+                path.insert(0, categories[parent]['name'])
+                parent = categories[parent]['parent']
+            category['path'] = path
+
+        parents = {c['parent'] for c in categories.values() if c['parent']}
+        for category in categories.values():
+            category['is_leaf'] = category['slug'] not in parents
+
+        logger.info(f"Found {len(categories)} categories")
+        return list(categories.values())
+
+    def _load_category_cache(self) -> Dict:
+        """Load the cached category tree, or an empty cache"""
+        if not os.path.exists(self.CATEGORY_CACHE_FILE):
+            return {'fetched_at': 0, 'categories': [], 'last_crawled': {}}
+        try:
+            with open(self.CATEGORY_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading category cache: {e}")
+            return {'fetched_at': 0, 'categories': [], 'last_crawled': {}}
+
+    def _save_category_cache(self, cache: Dict):
+        """Write the category cache to disk"""
+        try:
+            with open(self.CATEGORY_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving category cache: {e}")
+
+    def get_category_tree(self, refresh: bool = False, max_age: float = 7 * 24 * 3600) -> List[Dict]:
+        """
+        Return the site's category tree, enumerating it only when the cache is stale
+
+        Args:
+            refresh: Force a fresh enumeration even if the cache is recent
+            max_age: Maximum cache age in seconds
+
+        Returns:
+            List of category dictionaries (see extract_categories)
+        """
+        cache = self._load_category_cache()
+        if not refresh and cache['categories'] and time.time() - cache['fetched_at'] < max_age:
+            return cache['categories']
+
+        try:
+            logger.info(f"Enumerating categories from {self.BASE_URL}")
+            response = self.session.get(self.BASE_URL, timeout=30)
+            response.raise_for_status()
+            categories = self.extract_categories(BeautifulSoup(response.content, 'html.parser'))
+        except Exception as e:
+            logger.error(f"Error enumerating categories: {e}")
+            return cache['categories']
+
+        if categories:
+            cache['categories'] = categories
+            cache['fetched_at'] = time.time()
+            self._save_category_cache(cache)
+        return categories or cache['categories']
+
+    def scrape_category(self, category: Dict, max_pages: int = 50, delay: float = 1.0,
+                        claim: Optional[Callable[[str], bool]] = None) -> List[Dict]:
+        """
+        Scrape the listing pages of a single category partition
+
+        Every listing is stamped with the partition's category path, so detail
+        pages are not scanned for category links.
+
+        Args:
+            category: Category dictionary from get_category_tree
+            max_pages: Maximum number of listing pages to walk
+            delay: Delay between requests in seconds
+            claim: Called with each listing ID; the detail page is only fetched if it returns True
+                   (used to fetch listings shared by several partitions once)
+
+        Returns:
+            List of full listing dictionaries, or None if no listing page could be loaded
+        """
+        listings = []
+        seen_ids = set()
+        pages_loaded = 0
+        failures = 0
+
+        for page_num in range(max_pages):
+            soup = self.get_listing_page(page_num, category['url'])
+            if not soup:
+                failures += 1
+                if failures >= self.MAX_PAGE_FAILURES:
+                    logger.warning(f"Giving up on {category['slug']} after {failures} failed pages")
+                    break
+                logger.warning(f"Skipping page {page_num} of {category['slug']} due to fetch error")
+                time.sleep(delay)
+                continue
+            pages_loaded += 1
+            failures = 0
+
+            # Stop when pagination runs past the end of the category
+            page_listings = [l for l in self.extract_listings_from_page(soup)
+                             if l['id'] and l['url'] and l['id'] not in seen_ids]
+            if not page_listings:
+                break
+
+            for listing in page_listings:
+                seen_ids.add(listing['id'])
+                if claim and not claim(listing['id']):
+                    continue
+                time.sleep(delay)
+
+                detail_info = self.extract_detail_info(listing['url'], listing['id'], category['path'])
+                listings.append({**listing, **detail_info})
+
+            logger.info(f"Completed page {page_num} of {category['slug']}, listings: {len(listings)}")
+            time.sleep(delay)
+
+        return listings if pages_loaded else None
+
+    def scrape_categories(self, slugs: Optional[List[str]] = None, max_pages: int = 50,
+                          delay: float = 1.0, max_workers: int = 4,
+                          min_interval: Optional[float] = None, refresh_tree: bool = False):
+        """
+        Crawl each leaf category as an independent partition in parallel
+
+        A listing found in several partitions is fetched once and carries the
+        category levels of all of them, in category tree order.
+
+        Args:
+            slugs: Restrict the crawl to these categories (a parent slug selects its leaves)
+            max_pages: Maximum number of listing pages per category
+            delay: Delay between requests in seconds, per partition
+            max_workers: Number of partitions crawled concurrently
+            min_interval: Skip partitions crawled less than this many seconds ago
+            refresh_tree: Re-enumerate the category tree instead of using the cache
+        """
+        tree = self.get_category_tree(refresh=refresh_tree)
+        by_slug = {c['slug']: c for c in tree}
+
+        def in_selection(category: Dict) -> bool:
+            if not slugs:
+                return True
+            slug = category['slug']
+            while slug:
+                if slug in slugs:
+                    return True
+                slug = by_slug[slug]['parent'] if slug in by_slug else None
+            return False
+
+        cache = self._load_category_cache()
+        last_crawled = cache.get('last_crawled', {})
+        partitions = [
+            c for c in tree
+            if c['is_leaf'] and in_selection(c)
+            and not (min_interval and time.time() - last_crawled.get(c['slug'], 0) < min_interval)
+        ]
+        logger.info(f"Crawling {len(partitions)} category partitions with {max_workers} workers")
+
+        # Listing ID -> slugs of the partitions it was found in
+        found_in: Dict[str, Set[str]] = {}
+        lock = threading.Lock()
+
+        def crawl(category: Dict) -> List[Dict]:
+            def claim(listing_id: str) -> bool:
+                with lock:
+                    first = listing_id not in found_in
+                    found_in.setdefault(listing_id, set()).add(category['slug'])
+                return first
+
+            # requests.Session is not thread-safe, so every partition gets its own scraper
+            return XidmetlerScraper().scrape_category(category, max_pages=max_pages, delay=delay, claim=claim)
+
+        seen_ids = {listing['id'] for listing in self.all_listings}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(crawl, c): c for c in partitions}
+            for future in as_completed(futures):
+                category = futures[future]
+                try:
+                    listings = future.result()
+                except Exception as e:
+                    logger.error(f"Error crawling category {category['slug']}: {e}")
+                    continue
+                if listings is None:
+                    # Leave last_crawled unset so the partition is retried next run
+                    logger.warning(f"No listing pages of category {category['slug']} could be loaded")
+                    continue
+
+                for listing in listings:
+                    if listing['id'] not in seen_ids:
+                        seen_ids.add(listing['id'])
+                        self.all_listings.append(listing)
+
+                last_crawled[category['slug']] = time.time()
+                self.crawled_categories.update(category['path'])
+                logger.info(f"Completed category {category['slug']}, total listings: {len(self.all_listings)}")
+
+        # Combine the paths of every partition a listing was found in
+        order = {c['slug']: position for position, c in enumerate(tree)}
+        for listing in self.all_listings:
+            slugs = sorted(found_in.get(listing['id'], ()), key=order.get)
+            if slugs:
+                listing['categories'] = combine_paths(by_slug[slug]['path'] for slug in slugs)
+
+        cache = self._load_category_cache()
+        cache['last_crawled'] = {**cache.get('last_crawled', {}), **last_crawled}
+        self._save_category_cache(cache)
+
+    @profiled('serialize')
     def save_to_json(self, filename: str = "xidmetler_listings.json"):
         """Save scraped data to JSON file"""
         try:
@@ -323,51 +656,165 @@ class XidmetlerScraper:
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
 
+    @profiled('serialize')
     def save_to_csv(self, filename: str = "xidmetler_listings.csv"):
-        """Save scraped data to CSV file"""
+        """Save scraped data to CSV file (compressed if filename ends in .gz or .zst)"""
         if not self.all_listings:
             logger.warning("No listings to save")
             return
 
         try:
-            # Define CSV fields
-            fieldnames = [
-                'id', 'listing_code', 'title', 'url', 'price',
-                'contact_name', 'phone', 'location', 'date',
-                'categories', 'description', 'image_url', 'images'
-            ]
-
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
-
-                for listing in self.all_listings:
-                    # Convert lists to strings for CSV
-                    row = listing.copy()
-                    if 'categories' in row and isinstance(row['categories'], list):
-                        row['categories'] = ', '.join(row['categories'])
-                    if 'images' in row and isinstance(row['images'], list):
-                        row['images'] = ', '.join(row['images'])
-                    writer.writerow(row)
-
-            logger.info(f"Saved {len(self.all_listings)} listings to {filename}")
+            count = write_csv(self.all_listings, filename)
+            logger.info(f"Saved {count} listings to {filename}")
         except Exception as e:
             logger.error(f"Error saving to CSV: {e}")
 
+    @profiled('serialize')
+    def save_to_jsonl(self, filename: str = "xidmetler_listings.jsonl.gz"):
+        """Save scraped data as JSON lines (compressed if filename ends in .gz or .zst)"""
+        try:
+            count = write_jsonl(self.all_listings, filename)
+            logger.info(f"Saved {count} listings to {filename}")
+        except Exception as e:
+            logger.error(f"Error saving to JSONL: {e}")
 
-def main():
-    """Main execution function"""
+    def merge_existing(self, filename: str) -> bool:
+        """
+        Merge the listings scraped this run into a previously saved listings file
+
+        Rows of re-scraped listing IDs are replaced, new listings are appended
+        and listings of partitions not crawled this run are kept. A replaced
+        row keeps the categories it had from partitions not crawled this run.
+
+        Args:
+            filename: Existing listings file (any format read by iter_listings)
+
+        Returns:
+            False if the existing file could not be read
+        """
+        if not os.path.exists(filename):
+            return True
+
+        try:
+            existing = list(iter_listings(filename))
+        except Exception as e:
+            logger.error(f"Error loading existing listings from {filename}: {e}")
+            return False
+
+        scraped = {str(listing['id']): listing for listing in self.all_listings}
+        merged = []
+        written = set()
+        for listing in existing:
+            listing_id = str(listing.get('id') or '')
+            if listing_id not in scraped:
+                merged.append(listing)
+            elif listing_id not in written:
+                written.add(listing_id)
+                merged.append(self._merge_categories(scraped[listing_id], listing))
+        merged.extend(listing for listing_id, listing in scraped.items() if listing_id not in written)
+
+        logger.info(f"Merged {len(scraped)} scraped listings into {len(existing)} from {filename}")
+        self.all_listings = merged
+        return True
+
+    def _merge_categories(self, scraped: Dict, existing: Dict) -> Dict:
+        """Return the scraped row with the existing row's categories from uncrawled partitions added"""
+        kept = [c for c in existing.get('categories') or []
+                if c and c != 'N/A' and c not in self.crawled_categories]
+        if not kept:
+            return scraped
+        categories = [c for c in scraped.get('categories') or [] if c != 'N/A']
+        return {**scraped, 'categories': combine_paths([categories, kept])}
+
+    def update_seller_index(self, filename: str = SellerIndex.DEFAULT_FILE):
+        """
+        Bring the persistent seller index in line with the saved dataset
+
+        self.all_listings holds the whole dataset at this point (category runs
+        are merged into the existing file first), so listings missing from it
+        are removed from the index.
+        """
+        try:
+            index = SellerIndex.load(filename)
+            current = {str(listing['id']) for listing in self.all_listings}
+            removed = [listing_id for listing_id in index.listings if listing_id not in current]
+            for listing_id in removed:
+                index.remove_listing(listing_id)
+            indexed = index.add_listings(self.all_listings)
+            index.save()
+            logger.info(f"Indexed {indexed} listings under {len(index.sellers)} sellers, "
+                        f"removed {len(removed)} no longer listed")
+        except Exception as e:
+            logger.error(f"Error updating seller index: {e}")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Register the command-line options"""
+    parser.add_argument('--by-category', action='store_true',
+                        help="Crawl each category as a parallel partition")
+    parser.add_argument('--categories', nargs='*',
+                        help="Category slugs to crawl (with --by-category)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Concurrent category partitions")
+    parser.add_argument('--min-interval', type=float,
+                        help="Skip categories crawled less than this many seconds ago")
+    parser.add_argument('--refresh-categories', action='store_true',
+                        help="Re-enumerate the category tree instead of using the cache")
+    parser.add_argument('--compress', choices=['none', 'gzip', 'zstd'], default='gzip',
+                        help="Output compression ('none' writes the legacy JSON and CSV files)")
+
+
+def run(args: argparse.Namespace):
+    """Run with parsed command-line options"""
     scraper = XidmetlerScraper()
 
-    # Scrape pages 0-49 (which corresponds to pages 1-50)
-    # Note: The URL parameter ?start=0 is page 1, ?start=1 is page 2, etc.
-    scraper.scrape_pages(start_page=0, end_page=50, delay=1.5)
+    if args.by_category:
+        scraper.scrape_categories(slugs=args.categories, max_pages=50, delay=1.5,
+                                  max_workers=args.workers, min_interval=args.min_interval,
+                                  refresh_tree=args.refresh_categories)
+    else:
+        # Scrape pages 0-49 (which corresponds to pages 1-50)
+        # Note: The URL parameter ?start=0 is page 1, ?start=1 is page 2, etc.
+        scraper.scrape_pages(start_page=0, end_page=50, delay=1.5)
+
+    if not scraper.all_listings:
+        logger.warning("No listings scraped, keeping the existing output")
+        return
+
+    scraped = list(scraper.all_listings)
+
+    # A category crawl may cover only some partitions; keep the rest of the dataset
+    if args.by_category and not scraper.merge_existing(find_listings_file()):
+        logger.error("Not saving partial crawl over an unreadable listings file")
+        return
 
     # Save results
-    scraper.save_to_json()
-    scraper.save_to_csv()
+    if args.compress == 'none':
+        scraper.save_to_json()
+        scraper.save_to_csv()
+    else:
+        extension = 'gz' if args.compress == 'gzip' else 'zst'
+        scraper.save_to_jsonl(f"xidmetler_listings.jsonl.{extension}")
+        scraper.save_to_csv(f"xidmetler_listings.csv.{extension}")
+    scraper.update_seller_index()
+
+    # Rebuild the dashboard cube once per data refresh
+    MarketCube.build(scraper.all_listings).save()
+
+    # Refresh the recrawl state of the scraped listings and register unknown ones
+    scheduler = RecrawlScheduler.load()
+    scheduler.observe(scraped)
+    scheduler.seed(scraper.all_listings)
+    scheduler.save()
+
+    logger.info(f"Scraping completed! Total listings saved: {len(scraper.all_listings)}")
 
-    logger.info(f"Scraping completed! Total listings scraped: {len(scraper.all_listings)}")
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Scrape xidmetler.az listings")
+    add_arguments(parser)
+    run(parser.parse_args())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Xidmetler.az Seller Index
+Persistent index of sellers keyed by normalized (E.164) phone number
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from listing_io import find_listings_file, iter_listings
+
+logger = logging.getLogger(__name__)
+
+# Azerbaijan country calling code
+COUNTRY_CODE = "994"
+
+
+def normalize_phone(raw) -> Optional[str]:
+    """
+    Normalize a single phone number to E.164
+
+    Handles the national format used on the site (0503304086), numbers that
+    lost their leading zero in CSV round-trips (503304086), and numbers that
+    already carry the country code (994..., +994..., 00994...).
+
+    Args:
+        raw: Phone number as scraped
+
+    Returns:
+        E.164 phone string (e.g. +994503304086) or None if not a phone number
+    """
+    if raw is None:
+        return None
+
+    digits = re.sub(r'\D', '', str(raw))
+    if digits.startswith('00'):
+        digits = digits[2:]
+
+    if len(digits) == 10 and digits.startswith('0'):
+        digits = COUNTRY_CODE + digits[1:]
+    elif len(digits) == 9:
+        digits = COUNTRY_CODE + digits
+
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def split_phones(raw) -> List[str]:
+    """Split a scraped phone field (may hold several comma-separated numbers) into E.164 numbers"""
+    if raw is None:
+        return []
+
+    phones = []
+    for part in re.split(r'[,;/]', str(raw)):
+        phone = normalize_phone(part)
+        if phone and phone not in phones:
+            phones.append(phone)
+    return phones
+
+
+def _listing_categories(listing: Dict) -> List[str]:
+    """Return the listing's categories as a list, dropping placeholders"""
+    categories = listing.get('categories') or []
+    if isinstance(categories, str):
+        categories = [categories]
+    # Entries may hold a whole path ("Ustalar, Təmir tikinti"); index each level
+    parts = [part.strip() for c in categories if c for part in str(c).split(',')]
+    return [c for c in parts if c and c not in ('N/A', 'nan')]
+
+
+def _add_unique(values: List, value):
+    """Append a value to a list if it is set and not already present"""
+    if value and value not in ('N/A', 'nan') and value not in values:
+        values.append(value)
+
+
+class SellerIndex:
+    """
+    Index mapping each seller's phone numbers to their listings
+
+    Phone numbers that appear together on one listing belong to the same
+    seller, so they are merged under a single seller key (the first phone
+    seen). Every phone resolves to its seller in O(1) via the phone map.
+    """
+
+    DEFAULT_FILE = "xidmetler_sellers.json"
+
+    def __init__(self, filename: str = DEFAULT_FILE):
+        """Initialize an empty index backed by filename"""
+        self.filename = filename
+        self.sellers: Dict[str, Dict] = {}
+        self.phones: Dict[str, str] = {}
+        self.listings: Dict[str, str] = {}
+        self.listing_categories: Dict[str, List[str]] = {}
+        self._by_category: Dict[str, set] = {}
+
+    @classmethod
+    def load(cls, filename: str = DEFAULT_FILE) -> 'SellerIndex':
+        """
+        Load an index from disk, or return an empty one if the file does not exist
+
+        Args:
+            filename: Path of the index file
+
+        Returns:
+            SellerIndex instance
+        """
+        index = cls(filename)
+        if not os.path.exists(filename):
+            return index
+
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index.sellers = data.get('sellers', {})
+            index.phones = data.get('phones', {})
+            index.listings = data.get('listings', {})
+            index.listing_categories = data.get('listing_categories', {})
+        except Exception as e:
+            logger.error(f"Error loading seller index from {filename}: {e}")
+            return cls(filename)
+
+        for key, seller in index.sellers.items():
+            for category in seller['categories']:
+                index._by_category.setdefault(category, set()).add(key)
+        return index
+
+    def save(self):
+        """Write the index to disk"""
+        try:
+            tmp_filename = f"{self.filename}.tmp"
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'sellers': self.sellers,
+                    'phones': self.phones,
+                    'listings': self.listings,
+                    'listing_categories': self.listing_categories
+                }, f, ensure_ascii=False)
+            os.replace(tmp_filename, self.filename)
+            logger.info(f"Saved {len(self.sellers)} sellers to {self.filename}")
+        except Exception as e:
+            logger.error(f"Error saving seller index: {e}")
+
+    def _merge(self, keep: str, drop: str):
+        """Merge seller drop into seller keep"""
+        source = self.sellers.pop(drop)
+        target = self.sellers[keep]
+        for field in ('phones', 'names', 'locations', 'categories'):
+            for value in source[field]:
+                _add_unique(target[field], value)
+        # A listing belongs to exactly one seller, so the two ID lists are disjoint
+        target['listing_ids'].extend(source['listing_ids'])
+
+        for phone in source['phones']:
+            self.phones[phone] = keep
+        for listing_id in source['listing_ids']:
+            self.listings[listing_id] = keep
+        for category in source['categories']:
+            members = self._by_category.get(category)
+            if members is not None:
+                members.discard(drop)
+                members.add(keep)
+
+    def _discard_category(self, category: str, key: str):
+        """Remove a seller from a category's member set"""
+        members = self._by_category.get(category)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self._by_category[category]
+
+    def _refresh_categories(self, key: str):
+        """Recompute a seller's categories from the listings still indexed under it"""
+        seller = self.sellers[key]
+        # Indexes saved before per-listing categories were recorded cannot be recomputed
+        if any(listing_id not in self.listing_categories for listing_id in seller['listing_ids']):
+            return
+
+        categories = []
+        for listing_id in seller['listing_ids']:
+            for category in self.listing_categories[listing_id]:
+                _add_unique(categories, category)
+        for category in seller['categories']:
+            if category not in categories:
+                self._discard_category(category, key)
+        seller['categories'] = categories
+
+    def remove_listing(self, listing_id) -> bool:
+        """
+        Detach a listing from its seller, dropping sellers left without listings
+
+        Args:
+            listing_id: ID of the listing
+
+        Returns:
+            True if the listing was indexed
+        """
+        listing_id = str(listing_id)
+        key = self.listings.pop(listing_id, None)
+        self.listing_categories.pop(listing_id, None)
+        if key not in self.sellers:
+            return key is not None
+
+        seller = self.sellers[key]
+        if listing_id in seller['listing_ids']:
+            seller['listing_ids'].remove(listing_id)
+        if seller['listing_ids']:
+            self._refresh_categories(key)
+            return True
+
+        del self.sellers[key]
+        for phone in seller['phones']:
+            if self.phones.get(phone) == key:
+                del self.phones[phone]
+        for category in seller['categories']:
+            self._discard_category(category, key)
+        return True
+
+    def add_listing(self, listing: Dict) -> Optional[str]:
+        """
+        Add or update a single listing in the index
+
+        Args:
+            listing: Listing dictionary as produced by the scraper
+
+        Returns:
+            Seller key the listing was indexed under, or None if it has no phone
+        """
+        listing_id = str(listing.get('id') or '')
+        phones = split_phones(listing.get('phone'))
+        if not listing_id or not phones:
+            return None
+
+        # Resolve every phone to its seller, merging sellers that share this listing
+        keys = []
+        for phone in phones:
+            key = self.phones.get(phone)
+            if key and key in self.sellers and key not in keys:
+                keys.append(key)
+
+        if keys:
+            key = max(keys, key=lambda k: len(self.sellers[k]['listing_ids']))
+            for other in keys:
+                if other != key:
+                    self._merge(key, other)
+        else:
+            key = phones[0]
+            self.sellers[key] = {
+                'phones': [], 'listing_ids': [], 'names': [],
+                'locations': [], 'categories': []
+            }
+
+        # self.listings doubles as the O(1) membership test for the sellers' listing_ids
+        previous = self.listing_categories.get(listing_id)
+        current = self.listings.get(listing_id)
+        if current not in (None, key):
+            self.remove_listing(listing_id)
+
+        seller = self.sellers[key]
+        for phone in phones:
+            _add_unique(seller['phones'], phone)
+            self.phones[phone] = key
+        if current != key:
+            seller['listing_ids'].append(listing_id)
+        _add_unique(seller['names'], listing.get('contact_name'))
+        _add_unique(seller['locations'], listing.get('location'))
+        categories = _listing_categories(listing)
+        for category in categories:
+            _add_unique(seller['categories'], category)
+            self._by_category.setdefault(category, set()).add(key)
+
+        self.listings[listing_id] = key
+        self.listing_categories[listing_id] = categories
+        if current == key and previous is not None and set(previous) - set(categories):
+            # The listing dropped categories since it was last indexed
+            self._refresh_categories(key)
+        return key
+
+    def add_listings(self, listings: Iterable[Dict]) -> int:
+        """
+        Add or update many listings in the index
+
+        Args:
+            listings: Iterable of listing dictionaries
+
+        Returns:
+            Number of listings indexed
+        """
+        return sum(1 for listing in listings if self.add_listing(listing))
+
+    def lookup(self, phone) -> Optional[Dict]:
+        """
+        Return the seller record for a phone number in any format
+
+        Args:
+            phone: Phone number (national or international format)
+
+        Returns:
+            Seller dictionary or None if the phone is unknown
+        """
+        key = self.phones.get(normalize_phone(phone))
+        return self.sellers.get(key) if key else None
+
+    def seller_for_listing(self, listing_id) -> Optional[Dict]:
+        """Return the seller record for a listing ID"""
+        key = self.listings.get(str(listing_id))
+        return self.sellers.get(key) if key else None
+
+    def sellers_in_category(self, category: str) -> int:
+        """Return the number of sellers with at least one listing in a category"""
+        return len(self._by_category.get(category, ()))
+
+    def summary(self) -> Dict:
+        """
+        Return seller-level aggregates
+
+        Returns:
+            Dictionary of seller counts, listings per seller and sellers per category
+        """
+        listing_counts = [len(s['listing_ids']) for s in self.sellers.values()]
+        return {
+            'total_sellers': len(self.sellers),
+            'total_phones': len(self.phones),
+            'indexed_listings': len(self.listings),
+            'avg_listings_per_seller': (sum(listing_counts) / len(listing_counts)) if listing_counts else 0.0,
+            'max_listings_per_seller': max(listing_counts, default=0),
+            'multi_listing_sellers': sum(1 for n in listing_counts if n > 1),
+            'sellers_by_category': {c: len(keys) for c, keys in self._by_category.items()}
+        }
+
+    def top_sellers(self, n: int = 10) -> List[Dict]:
+        """Return the n sellers with the most listings"""
+        ranked = sorted(self.sellers.items(), key=lambda item: len(item[1]['listing_ids']), reverse=True)
+        return [{'seller': key, **seller} for key, seller in ranked[:n]]
+
+
+def build_index(listings_file: Optional[str] = None,
+                index_file: str = SellerIndex.DEFAULT_FILE) -> SellerIndex:
+    """Rebuild the seller index from a listings file (defaults to the most recently written one)"""
+    index = SellerIndex(index_file)
+    index.add_listings(iter_listings(listings_file or find_listings_file()))
+    index.save()
+    return index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    index = build_index()
+    for key, value in index.summary().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from recrawl import DAY, RecrawlScheduler
+
+
+def make_listing(listing_id, price, date='01.10.2025'):
+    return {'id': listing_id, 'url': f"https://xidmetler.az/elan/{listing_id}", 'price': price, 'date': date}
+
+
+class ObserveTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RecrawlScheduler('unused.json')
+        self.now = 1_760_000_000.0
+        self.scheduler.seed([make_listing('1', '10 Azn'), make_listing('2', '30 Azn')], now=self.now)
+
+    def test_scrape_refreshes_known_price(self):
+        self.scheduler.observe([make_listing('1', '20 Azn')], now=self.now + DAY)
+
+        entry = self.scheduler.state['1']
+        self.assertEqual(entry['price'], '20 Azn')
+        self.assertEqual(entry['previous_price'], '10 Azn')
+        self.assertEqual(entry['changes'], 1)
+        self.assertGreater(entry['next_due'], self.now + DAY)
+
+    def test_scrape_reactivates_removed_listing(self):
+        self.scheduler.record('1', {'removed': True, 'price': None, 'date': None}, now=self.now + DAY)
+        self.scheduler.observe([make_listing('1', '10 Azn')], now=self.now + 2 * DAY)
+
+        entry = self.scheduler.state['1']
+        self.assertEqual(entry['status'], 'active')
+        self.assertNotIn('removed_at', entry)
+        self.assertIn('1', self.scheduler.due(10, now=entry['next_due']))
+
+    def test_observe_registers_unknown_listings(self):
+        self.assertEqual(self.scheduler.observe([make_listing('3', '5 Azn')], now=self.now), 0)
+        self.assertEqual(self.scheduler.state['3']['status'], 'active')
+
+
+class ApplyTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RecrawlScheduler('unused.json')
+        self.now = 1_760_000_000.0
+        self.scheduler.seed([make_listing('1', '10 Azn'), make_listing('2', '30 Azn')], now=self.now)
+
+    def test_only_checked_listings_are_rewritten(self):
+        # Listing 2 has a newer price in the dataset than in the scheduler state
+        listings = [make_listing('1', '10 Azn'), make_listing('2', '35 Azn')]
+        self.scheduler.record('1', {'removed': False, 'price': '15 Azn', 'date': None}, now=self.now + DAY)
+
+        updated = self.scheduler.apply(listings, ['1'])
+        self.assertEqual([l['price'] for l in updated], ['15 Azn', '35 Azn'])
+
+    def test_removed_listings_are_dropped(self):
+        listings = [make_listing('1', '10 Azn'), make_listing('2', '30 Azn')]
+        self.scheduler.record('2', {'removed': True, 'price': None, 'date': None}, now=self.now + DAY)
+
+        self.assertEqual([l['id'] for l in self.scheduler.apply(listings, ['2'])], ['1'])
+
+
+if __name__ == '__main__':
+    unittest.main()